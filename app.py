@@ -31,7 +31,8 @@ if run_scrape:
         with st.spinner("Scraping in progress... This may take a few minutes depending on results."):
 
             # Run async scraping
-            df = asyncio.run(scrape_careers(query, max_results=max_results))
+            rows = asyncio.run(scrape_careers(query, max_results=max_results))
+            df = pd.DataFrame(rows)
 
             if df.empty:
                 st.warning("No results found.")
@@ -3,10 +3,11 @@
 # ------------------------------
 
 from ddgs import DDGS   # Correct new package
-import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
 import re
-import pandas as pd
+import csv
 from urllib.parse import urlparse
 from datetime import datetime
 import sys
@@ -14,70 +15,105 @@ import sys
 MAX_RESULTS = 50
 USER_AGENT = "Mozilla/5.0 (compatible; JobScraper/1.0; +https://example.com/bot)"
 EMAIL_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-z]{2,}"
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+SEM_MAX = 20
+MAX_PAGE_BYTES = 2_000_000
+CSV_FIELDS = ["title", "description", "emails", "company", "location", "salary", "query", "url", "domain", "scraped_at"]
+
+def is_html_response(r: httpx.Response) -> bool:
+    """True for HTML responses not advertised as larger than MAX_PAGE_BYTES."""
+    ctype = r.headers.get("content-type", "")
+    if ctype and "html" not in ctype.lower():
+        return False
+    try:
+        return int(r.headers.get("content-length", 0)) <= MAX_PAGE_BYTES
+    except ValueError:
+        return True
 
 scraped_data = []
 visited_domains = set()
 
-def scrape_page(url: str) -> dict | None:
-    """Scrape a page to extract job title, description, and emails."""
+sem = asyncio.Semaphore(SEM_MAX)
+
+def parse_page(html: str) -> dict:
+    """Extract job title, description, and emails from a page's HTML."""
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("h1") or soup.find("title")
+    title_text = title_tag.get_text(strip=True) if title_tag else "N/A"
+    description = soup.get_text(separator=" ", strip=True)[:500]
+    emails = list(dict.fromkeys(e.strip().lower() for e in EMAIL_RE.findall(html)))  # dedupe, keep page order
+
+    return {
+        "title": title_text,
+        "description": description,
+        "emails": ", ".join(emails) if emails else "N/A",
+        "company": "N/A",
+        "location": "N/A",
+        "salary": "N/A"
+    }
+
+async def fetch_and_parse(client: httpx.AsyncClient, url: str) -> dict | None:
+    """Fetch a page and extract job title, description, and emails."""
     try:
-        res = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=10)
-        if res.status_code != 200:
-            return None
-
-        soup = BeautifulSoup(res.text, "lxml")
-        title_tag = soup.find("h1") or soup.find("title")
-        title_text = title_tag.get_text(strip=True) if title_tag else "N/A"
-        description = soup.get_text(separator=" ", strip=True)[:500]
-        emails = set(re.findall(EMAIL_PATTERN, res.text))
-
-        return {
-            "title": title_text,
-            "description": description,
-            "emails": ", ".join(emails) if emails else "N/A",
-            "company": "N/A",
-            "location": "N/A",
-            "salary": "N/A"
-        }
+        async with sem:
+            async with client.stream("GET", url, headers={"User-Agent": USER_AGENT}, timeout=10, follow_redirects=True) as res:
+                if res.status_code != 200:
+                    return None
+                # skip PDFs, images, etc. before downloading the body
+                if not is_html_response(res):
+                    return None
+                await res.aread()
+
+        # parse in a worker thread so fetches still in flight aren't stalled
+        return await asyncio.to_thread(parse_page, res.text)
     except Exception as e:
         print(f"⚠️ Error scraping {url}: {e}")
         return None
 
-def job_scraper(query: str, max_results: int = MAX_RESULTS):
+async def job_scraper(query: str, max_results: int = MAX_RESULTS):
     with DDGS() as ddg:
         results = list(ddg.text(query, max_results=max_results))  # ensure list
-        if not results:
-            print("❌ No search results found.")
-            return
-
-        for r in results:
-            url = r.get("href")
-            if not url:
-                continue
-
-            domain = urlparse(url).netloc.lower()
-            if domain in visited_domains:
-                continue
-            visited_domains.add(domain)
-
-            print(f"🔎 Scraping: {url}")
-            page_data = scrape_page(url)
-            if page_data:
-                page_data.update({
-                    "query": query,
-                    "url": url,
-                    "domain": domain,
-                    "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-                scraped_data.append(page_data)
-
-        if scraped_data:
-            df = pd.DataFrame(scraped_data)
-            filename = f"jobs_auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df.to_csv(filename, index=False)
-            print(f"✅ Data saved to {filename}")
-        else:
-            print("⚠️ No data scraped.")
+    if not results:
+        print("❌ No search results found.")
+        return
+
+    # one URL per domain, collected up front so pages can be fetched concurrently
+    urls = []
+    for r in results:
+        url = r.get("href")
+        if not url:
+            continue
+
+        domain = urlparse(url).netloc.lower()
+        if domain in visited_domains:
+            continue
+        visited_domains.add(domain)
+        urls.append((url, domain))
+
+    print(f"🔎 Scraping {len(urls)} pages...")
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=SEM_MAX)) as client:
+        pages = await asyncio.gather(*[fetch_and_parse(client, url) for url, _ in urls], return_exceptions=True)
+
+    scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for (url, domain), page_data in zip(urls, pages):
+        if isinstance(page_data, dict):
+            page_data.update({
+                "query": query,
+                "url": url,
+                "domain": domain,
+                "scraped_at": scraped_at
+            })
+            scraped_data.append(page_data)
+
+    if scraped_data:
+        filename = f"jobs_auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(scraped_data)
+        print(f"✅ Data saved to {filename}")
+    else:
+        print("⚠️ No data scraped.")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -87,4 +123,4 @@ if __name__ == "__main__":
 
     search_query = " ".join(sys.argv[1:])
     print(f"🔍 Searching for jobs: {search_query}")
-    job_scraper(search_query, max_results=50)
+    asyncio.run(job_scraper(search_query, max_results=50))
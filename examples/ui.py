@@ -12,21 +12,32 @@ from urllib.parse import urlparse
 # ------------------------------
 USER_AGENT = "Mozilla/5.0 (compatible; JobScraper/1.0; +https://example.com/bot)"
 EMAIL_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-z]{2,}"
+EMAIL_RE = re.compile(EMAIL_PATTERN)
 
 # ------------------------------
 # Helper functions
 # ------------------------------
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Pooled session shared across Streamlit re-runs, so keep-alive connections are reused."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=50)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 def scrape_page(url):
     try:
-        res = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=10)
+        res = get_session().get(url, timeout=10)
         if res.status_code != 200:
             return None
 
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = BeautifulSoup(res.text, "lxml")
         title_tag = soup.find("h1") or soup.find("title")
         title_text = title_tag.get_text().strip() if title_tag else "N/A"
         description = soup.get_text(separator=" ", strip=True)[:500]
-        emails = set(re.findall(EMAIL_PATTERN, res.text))
+        emails = list(dict.fromkeys(e.strip().lower() for e in EMAIL_RE.findall(res.text)))  # dedupe, keep page order
 
         return {
             "title": title_text,
@@ -39,6 +50,7 @@ def scrape_page(url):
 def job_scraper(query, max_results=20):
     scraped_data = []
     visited_domains = set()
+    scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     with DDGS() as ddg:
         results = ddg.text(query, max_results=max_results)
@@ -58,7 +70,7 @@ def job_scraper(query, max_results=20):
                     "query": query,
                     "url": url,
                     "domain": domain,
-                    "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    "scraped_at": scraped_at
                 })
                 scraped_data.append(page_data)
 
@@ -4,12 +4,23 @@
 
 import asyncio
 import argparse
+import csv
+import os
 import re
+import socket
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse, urljoin
+from functools import lru_cache
+from html import unescape
+from urllib.parse import unquote, urlparse, urljoin
 
+import certifi
 import httpx
-import pandas as pd
 from bs4 import BeautifulSoup
 from ddgs import DDGS
 
@@ -18,12 +29,25 @@ from ddgs import DDGS
 # -----------------------------
 USER_AGENT = "Mozilla/5.0 (compatible; CareerFinder/1.0; +https://example.com/bot)"
 EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", re.I)
-OBFUSCATIONS = [
-    (r"\[at\]|\(at\)|\s+at\s+", "@"),
-    (r"\[dot\]|\(dot\)|\s+dot\s+", "."),
-    (r"\s*\[underscore\]\s*", "_"),
-]
+EMAIL_START_RE = re.compile(r"(?<![a-zA-Z0-9._%+\-])" + EMAIL_RE.pattern, re.I)  # see find_emails()
+# href value as written (double-quoted, single-quoted or unquoted); decoded in mailto_address()
+MAILTO_RE = re.compile(r"""href\s*=\s*(?:"mailto:([^"]*)"|'mailto:([^']*)'|mailto:([^\s"'>]+))""", re.I)
+# all obfuscations in one alternation so the page is scanned once; the group name picks the replacement.
+# Same output as the old at -> dot -> underscore passes: a dot/underscore leaves its trailing whitespace
+# (possessive, no backtracking) to a following " at " / " dot " that the earlier pass would have taken.
+OBFUSCATION_RE = re.compile(
+    r"(?P<at>\[at\]|\(at\)|\s+at\s+)"
+    r"|(?P<dot>\[dot\]|\(dot\)|\s+dot\s++(?!at\s))"
+    r"|(?P<underscore>\s*\[underscore\](?:\s++(?!at\s|dot\s++(?!at\s)))?)",
+    re.I,
+)
+OBFUSCATION_REPL = {"at": "@", "dot": ".", "underscore": "_"}
 JOB_KEYWORDS = ["job", "jobs", "career", "careers", "apply", "hiring", "vacancy", "vacancies", "open position", "openings", "join our team"]
+# word-start anchored only, so plurals/suffixes still match ("open positions", "applying")
+JOB_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, JOB_KEYWORDS)) + ")", re.I)
+
+# big job boards / social sites: probing their career paths never yields company emails
+BLOCKED_DOMAINS = {"linkedin.com", "indeed.com", "glassdoor.com", "facebook.com", "twitter.com", "x.com", "youtube.com"}
 
 # candidate paths to probe on each domain (career paths + contact)
 COMMON_PATHS = [
@@ -32,72 +56,198 @@ COMMON_PATHS = [
     "/work-with-us", "/about-us/careers", "/team", "/about", "/contact", "/contact-us"
 ]
 
-# concurrency
-SEM_MAX = 20
+# concurrency (domains probed at once; each domain's paths share one h2 connection)
+DOMAIN_SEM_MAX = 10
 TIMEOUT = 12
+MAX_PAGE_BYTES = 2_000_000
+
+# one TLS context for the process: CA bundle loaded once and reused by every
+# AsyncClient (Streamlit re-runs scrape_careers many times in the same process)
+def make_ssl_context() -> ssl.SSLContext:
+    """CA lookup in httpx's verify=True order: SSL_CERT_FILE, then SSL_CERT_DIR, then certifi."""
+    cert_file = os.environ.get("SSL_CERT_FILE")
+    cert_dir = os.environ.get("SSL_CERT_DIR")
+    if cert_file and os.path.isfile(cert_file):
+        ctx = ssl.create_default_context(cafile=cert_file)
+    elif cert_dir and os.path.isdir(cert_dir):
+        ctx = ssl.create_default_context(capath=cert_dir)
+    else:
+        ctx = ssl.create_default_context(cafile=certifi.where())
+    ctx.set_alpn_protocols(["h2", "http/1.1"])
+    return ctx
+
+SSL_CTX = make_ssl_context()
+
+# DNS cache (every probe on a domain resolves the same host)
+DNS_TTL = 300
+DNS_CACHE_MAX = 1024
 
 # -----------------------------
 # Utilities
 # -----------------------------
 def clean_obfuscation(text: str) -> str:
-    s = text
-    for pattern, repl in OBFUSCATIONS:
-        s = re.sub(pattern, repl, s, flags=re.I)
-    return s
+    return OBFUSCATION_RE.sub(lambda m: OBFUSCATION_REPL[m.lastgroup], text)
+
+@lru_cache(maxsize=4096)
+def _netloc(url: str) -> str:
+    """Lower-cased host[:port] of a URL (cached; the same URLs recur across searches)."""
+    return urlparse(url).netloc.lower()
+
+def find_emails(text: str) -> list:
+    """Same result as EMAIL_RE.findall(text), in linear time.
+
+    A plain findall retries every offset of a long run with no "@" (base64 data URIs, minified JS),
+    which is quadratic. EMAIL_START_RE only starts at the beginning of a run; right after a match we
+    also try EMAIL_RE at the match end, which may sit mid-run ("a@x.com_b@y.org" -> both addresses).
+    """
+    found = []
+    pos = 0
+    while True:
+        m = EMAIL_RE.match(text, pos) or EMAIL_START_RE.search(text, pos)
+        if m is None:
+            return found
+        found.append(m.group())
+        pos = m.end()
+
+def mailto_address(value: str) -> str:
+    """Decode a raw mailto: href value (entities, %-escapes, ?query); '' if it isn't an address."""
+    addr = unquote(unescape(value).split("?")[0]).strip().lower()
+    return addr if EMAIL_RE.fullmatch(addr) else ""
 
 def extract_emails_from_html(html: str) -> list:
     emails = set()
-    # mailto links
-    try:
-        soup = BeautifulSoup(html, "html.parser")
-        for a in soup.select('a[href^="mailto:"]'):
-            addr = a.get("href").split("mailto:")[1].split("?")[0].strip()
-            if addr:
-                emails.add(addr)
-    except Exception:
-        pass
+    # mailto links (regex over the raw HTML; no need to build a tree just for hrefs)
+    for groups in MAILTO_RE.findall(html):
+        addr = mailto_address("".join(groups))
+        if addr:
+            emails.add(addr)
 
     # regex on cleaned text and raw html
     cleaned = clean_obfuscation(html)
-    for m in EMAIL_RE.findall(cleaned):
+    for m in find_emails(cleaned):
         emails.add(m.strip().lower())
 
     return sorted(emails)
 
+def is_blocked(domain: str) -> bool:
+    return any(domain == b or domain.endswith("." + b) for b in BLOCKED_DOMAINS)
+
 def is_job_like(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in JOB_KEYWORDS)
+    return JOB_RE.search(text or "") is not None
+
+# -----------------------------
+# DNS cache
+# -----------------------------
+_getaddrinfo = socket.getaddrinfo
+_dns_cache = OrderedDict()
+_dns_lock = threading.Lock()
+_dns_key_locks = {}  # only keys with a lookup in progress; dropped once it finishes
+_dns_users = 0
+
+def cached_getaddrinfo(host, port, *args, **kwargs):
+    """socket.getaddrinfo with an in-process LRU cache bounded by DNS_TTL."""
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    with _dns_lock:
+        key_lock = _dns_key_locks.setdefault(key, threading.Lock())
+    # concurrent lookups of the same host wait for the first one instead of all hitting the resolver
+    try:
+        with key_lock:
+            with _dns_lock:
+                hit = _dns_cache.get(key)
+                if hit and hit[0] > time.monotonic():
+                    _dns_cache.move_to_end(key)
+                    return hit[1]
+            result = _getaddrinfo(host, port, *args, **kwargs)
+            with _dns_lock:
+                _dns_cache[key] = (time.monotonic() + DNS_TTL, result)
+                _dns_cache.move_to_end(key)
+                while len(_dns_cache) > DNS_CACHE_MAX:
+                    _dns_cache.popitem(last=False)
+            return result
+    finally:
+        with _dns_lock:
+            if _dns_key_locks.get(key) is key_lock:
+                del _dns_key_locks[key]
+
+@contextmanager
+def dns_cache():
+    """Route name resolution (used by httpx via the event loop) through the cache while active.
+
+    socket.getaddrinfo is process-wide, so it is patched only for the duration of a scrape and
+    restored when the last overlapping scrape (e.g. another Streamlit session) finishes.
+    """
+    global _dns_users
+    with _dns_lock:
+        if _dns_users == 0:
+            socket.getaddrinfo = cached_getaddrinfo
+        _dns_users += 1
+    try:
+        yield
+    finally:
+        with _dns_lock:
+            _dns_users -= 1
+            if _dns_users == 0:
+                socket.getaddrinfo = _getaddrinfo
 
 # -----------------------------
 # Async fetch/probe
 # -----------------------------
-sem = asyncio.Semaphore(SEM_MAX)
+def is_html_response(r: httpx.Response) -> bool:
+    """True for HTML responses not advertised as larger than MAX_PAGE_BYTES."""
+    ctype = r.headers.get("content-type", "")
+    if ctype and "html" not in ctype.lower():
+        return False
+    try:
+        return int(r.headers.get("content-length", 0)) <= MAX_PAGE_BYTES
+    except ValueError:
+        return True
 
 async def fetch(client: httpx.AsyncClient, url: str) -> tuple[str, int, str]:
-    """Return (url, status_code, text) or (url, 0, '') on failure."""
+    """Return (url, status_code, text) or (url, 0, '') on failure.
+
+    text is '' for non-200, non-HTML or oversized responses, whose bodies are never (fully) downloaded.
+    """
     try:
-        async with sem:
-            r = await client.get(url, headers={"User-Agent": USER_AGENT}, timeout=TIMEOUT, follow_redirects=True)
-            return (url, r.status_code, r.text)
+        async with client.stream("GET", url, headers={"User-Agent": USER_AGENT}, timeout=TIMEOUT, follow_redirects=True) as r:
+            # decide from the headers before downloading 404 pages, PDFs, images, JSON, ...
+            if r.status_code != 200 or not is_html_response(r):
+                return (url, r.status_code, "")
+            # Content-Length is absent for chunked responses and is the compressed size otherwise,
+            # so enforce the cap on the decoded bytes as they arrive
+            body = bytearray()
+            async for chunk in r.aiter_bytes():
+                body += chunk
+                if len(body) > MAX_PAGE_BYTES:
+                    return (url, r.status_code, "")
+            return (url, r.status_code, body.decode(r.encoding or "utf-8", errors="replace"))
     except Exception:
         return (url, 0, "")
 
-async def probe_domain(client: httpx.AsyncClient, domain: str) -> list:
-    """Probe common paths on a domain; return list of (url, status, html)."""
+async def probe_domain(client: httpx.AsyncClient, domain: str, sem: asyncio.Semaphore) -> tuple[str, list]:
+    """Probe common paths on a domain; return (domain, list of (url, status, html))."""
     scheme = "https"
     base = f"{scheme}://{domain}"
     urls = [base] + [urljoin(base, p) for p in COMMON_PATHS]
-    tasks = [fetch(client, u) for u in urls]
-    results = await asyncio.gather(*tasks)
+    async with sem:
+        tasks = [fetch(client, u) for u in urls]
+        results = await asyncio.gather(*tasks)
     # filter successful pages (200)
-    return [r for r in results if r[1] == 200 and r[2]]
+    return domain, [r for r in results if r[1] == 200 and r[2]]
 
 # -----------------------------
 # Search + discovery
 # -----------------------------
+def _ddg_text(q: str, max_results: int) -> list:
+    """Run one DDG text search; DDGS is sync, so this runs in a worker thread."""
+    try:
+        with DDGS() as ddg:
+            return list(ddg.text(q, max_results=max_results))
+    except Exception:
+        return []
+
 def ddg_search_domains(query: str, max_results: int = 50) -> set:
-    """Use ddgs to search many query patterns and collect domains."""
-    domains = set()
+    """Use ddgs to search many query patterns (concurrently) and collect domains."""
+    domains = {}  # www-less host -> first host form seen (template order), so www.x.com and x.com are probed once
     # query templates to broaden discovery
     templates = [
         "{q} jobs",
@@ -105,70 +255,77 @@ def ddg_search_domains(query: str, max_results: int = 50) -> set:
         "{q} \"career\"",
         "{q} \"apply\"",
         "{q} \"hiring\"",
-        "{q} site:linkedin.com {q}",
-        "{q} site:indeed.com {q}",
-        "{q} site:glassdoor.com {q}"
     ]
-    with DDGS() as ddg:
-        for t in templates:
-            q = t.format(q=query)
-            try:
-                for item in ddg.text(q, max_results=max_results//len(templates)):
-                    href = item.get("href") or item.get("link")
-                    if not href:
-                        continue
-                    parsed = urlparse(href)
-                    domain = parsed.netloc.lower()
-                    if domain:
-                        domains.add(domain)
-            except Exception:
-                continue
-    return domains
+    per_query = max_results // len(templates)
+    with ThreadPoolExecutor(max_workers=len(templates)) as ex:
+        futures = [ex.submit(_ddg_text, t.format(q=query), per_query) for t in templates]
+        # all queries are already in flight; consuming them in template order keeps the result deterministic
+        for fut in futures:
+            for item in fut.result():
+                href = item.get("href") or item.get("link")
+                if not href:
+                    continue
+                domain = _netloc(href)
+                if domain and not is_blocked(domain):
+                    domains.setdefault(domain.removeprefix("www."), domain)
+    return set(domains.values())
 
 # -----------------------------
 # Higher-level scraping flow
 # -----------------------------
-async def scrape_careers(query: str, max_results: int = 60) -> pd.DataFrame:
-    """Discover domains, probe career/contact paths, extract emails & metadata."""
+ROW_FIELDS = ["domain", "url", "status", "title", "snippet", "is_job_like", "emails", "scraped_at"]
+
+def build_row(domain: str, url: str, status: int, html: str, scraped_at: str) -> dict:
+    """Parse one probed page into a result row (title, snippet, emails, job flag)."""
+    title = ""
+    snippet = ""
+    try:
+        soup = BeautifulSoup(html, "lxml")
+        title_tag = soup.find("h1") or soup.find("title")
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        snippet = soup.get_text(separator=" ", strip=True)[:800]
+    except Exception:
+        pass
+
+    emails = extract_emails_from_html(html)
+    job_like = is_job_like(snippet) or is_job_like(title)
+
+    return {
+        "domain": domain,
+        "url": url,
+        "status": status,
+        "title": title or "N/A",
+        "snippet": snippet,
+        "is_job_like": job_like,
+        "emails": ";".join(emails) if emails else "",
+        "scraped_at": scraped_at
+    }
+
+async def scrape_careers(query: str, max_results: int = 60) -> list[dict]:
+    """Discover domains, probe career/contact paths, extract emails & metadata (one dict per page)."""
     print(f"[+] Searching for domains for query: {query}")
     domains = ddg_search_domains(query, max_results=max_results)
     print(f"[+] Discovered {len(domains)} unique domains. Probing common career/contact paths...")
 
-    async with httpx.AsyncClient() as client:
-        tasks = [probe_domain(client, d) for d in domains]
-        probe_results = await asyncio.gather(*tasks)
-
     rows = []
-    for domain, probes in zip(domains, probe_results):
-        # probes is list of (url, status, html)
-        for url, status, html in probes:
-            title = ""
-            snippet = ""
-            try:
-                soup = BeautifulSoup(html, "html.parser")
-                title_tag = soup.find("h1") or soup.find("title")
-                title = title_tag.get_text(strip=True) if title_tag else ""
-                snippet = soup.get_text(separator=" ", strip=True)[:800]
-            except Exception:
-                pass
-
-            emails = extract_emails_from_html(html)
-            job_like = is_job_like(snippet) or is_job_like(title)
-
-            rows.append({
-                "domain": domain,
-                "url": url,
-                "status": status,
-                "title": title or "N/A",
-                "snippet": snippet,
-                "is_job_like": job_like,
-                "emails": ";".join(emails) if emails else "",
-                "scraped_at": datetime.now().isoformat()
-            })
-    df = pd.DataFrame(rows)
+    scraped_at = datetime.now().isoformat()
+    with dns_cache():
+        limits = httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30)
+        async with httpx.AsyncClient(http2=True, limits=limits, timeout=TIMEOUT, verify=SSL_CTX) as client:
+            # created per run so it binds to the current event loop (Streamlit calls asyncio.run repeatedly)
+            sem = asyncio.Semaphore(DOMAIN_SEM_MAX)
+            tasks = [probe_domain(client, d, sem) for d in domains]
+            # parse each domain as soon as it finishes so its HTML can be freed
+            # instead of holding every page of every domain until the last one is done;
+            # parsing runs in a worker thread so the streams still in flight aren't stalled
+            for fut in asyncio.as_completed(tasks):
+                domain, probes = await fut
+                for url, status, html in probes:
+                    rows.append(await asyncio.to_thread(build_row, domain, url, status, html, scraped_at))
+
     # prefer job_like pages first
-    df = df.sort_values(by=["is_job_like", "domain"], ascending=[False, True])
-    return df
+    rows.sort(key=lambda r: (not r["is_job_like"], r["domain"]))
+    return rows
 
 # -----------------------------
 # CLI runner
@@ -180,13 +337,16 @@ def main():
     parser.add_argument("--out", type=str, default=None, help="CSV output filename (auto if not set)")
     args = parser.parse_args()
 
-    df = asyncio.run(scrape_careers(args.query, max_results=args.max))
+    rows = asyncio.run(scrape_careers(args.query, max_results=args.max))
     if args.out:
         out_file = args.out
     else:
         out_file = f"careers_{args.query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(out_file, index=False)
-    print(f"[+] Saved {len(df)} rows to {out_file}")
+    with open(out_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=ROW_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"[+] Saved {len(rows)} rows to {out_file}")
 
 if __name__ == "__main__":
     main()